@@ -0,0 +1,140 @@
+import math
+from datetime import timedelta, timezone
+from collections import defaultdict
+from models import db, Booking, Room, User, Department
+from cache import TTLCache
+from routing import current_site
+
+GROUP_BY_OPTIONS = ['room', 'department', 'hour_of_week']
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+HOURS_PER_WEEK = 7 * 24
+MAX_RANGE_DAYS = 366
+
+timeseries_cache = TTLCache(maxsize=128, ttl=60)
+
+def _hour_slices(start, end):
+    current = start
+    while current < end:
+        next_hour = current.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        slice_end = min(next_hour, end)
+        yield current, slice_end
+        current = slice_end
+
+def _utc_to_local(value):
+    # created_at is stored as naive UTC, booking times as naive local wall-clock time
+    return value.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+def _peak_concurrency(intervals):
+    events = []
+    for start, end in intervals:
+        events.append((start, 1))
+        events.append((end, -1))
+    # Ends sort before starts at the same instant, so back-to-back bookings don't overlap
+    events.sort(key=lambda event: (event[0], event[1]))
+
+    current = peak = 0
+    for _, delta in events:
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+def _hour_of_week_counts(range_start, range_end):
+    first_hour = range_start.replace(minute=0, second=0, microsecond=0)
+    total_hours = math.ceil((range_end - first_hour).total_seconds() / 3600)
+    full_weeks, remaining_hours = divmod(total_hours, HOURS_PER_WEEK)
+    first_index = first_hour.weekday() * 24 + first_hour.hour
+
+    counts = {}
+    for offset in range(min(total_hours, HOURS_PER_WEEK)):
+        index = (first_index + offset) % HOURS_PER_WEEK
+        counts[divmod(index, 24)] = full_weeks + (1 if offset < remaining_hours else 0)
+    return counts
+
+def compute_timeseries(range_start, range_end, group_by='room'):
+    """Occupancy, peak concurrency and lead time for bookings in [range_start, range_end)."""
+    cache_key = (current_site(), range_start, range_end, group_by)
+    cached = timeseries_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    rows = db.session.query(
+        Booking.id,
+        Room.name,
+        Department.name,
+        Booking.start_time,
+        Booking.end_time,
+        Booking.created_at
+    ).join(Room, Booking.room_id == Room.id).join(
+        User, Booking.user_id == User.id
+    ).outerjoin(
+        Department, User.department_id == Department.id
+    ).filter(
+        Booking.status != 'rejected',
+        Booking.start_time < range_end,
+        Booking.end_time > range_start
+    ).all()
+
+    room_names = [name for (name,) in db.session.query(Room.name).filter(Room.deleted_at.is_(None)).order_by(Room.name).all()]
+    room_count = len(room_names)
+    range_minutes = (range_end - range_start).total_seconds() / 60
+
+    intervals = defaultdict(list)
+    booked_minutes = defaultdict(float)
+    booking_ids = defaultdict(set)
+    lead_times = defaultdict(list)
+
+    for booking_id, room_name, department_name, start_time, end_time, created_at in rows:
+        clipped_start = max(start_time, range_start)
+        clipped_end = min(end_time, range_end)
+
+        if group_by == 'hour_of_week':
+            slices = [
+                ((slice_start.weekday(), slice_start.hour), slice_start, slice_end)
+                for slice_start, slice_end in _hour_slices(clipped_start, clipped_end)
+            ]
+            lead_key = (start_time.weekday(), start_time.hour)
+        else:
+            key = room_name if group_by == 'room' else (department_name or 'No Department')
+            slices = [(key, clipped_start, clipped_end)]
+            lead_key = key
+
+        for key, slice_start, slice_end in slices:
+            intervals[key].append((slice_start, slice_end))
+            booked_minutes[key] += (slice_end - slice_start).total_seconds() / 60
+            booking_ids[key].add(booking_id)
+
+        if created_at and start_time >= range_start:
+            lead_times[lead_key].append((start_time - _utc_to_local(created_at)).total_seconds() / 3600)
+
+    if group_by == 'hour_of_week':
+        hour_counts = _hour_of_week_counts(range_start, range_end)
+        keys = sorted(hour_counts)
+        capacity_minutes = {key: hour_counts[key] * 60 * room_count for key in keys}
+    elif group_by == 'room':
+        keys = room_names
+        capacity_minutes = {key: range_minutes for key in keys}
+    else:
+        keys = sorted(set(booked_minutes) | set(lead_times))
+        capacity_minutes = {key: range_minutes * room_count for key in keys}
+
+    groups = []
+    for key in keys:
+        capacity = capacity_minutes[key]
+        leads = lead_times.get(key, [])
+        groups.append({
+            'group': f'{WEEKDAYS[key[0]]} {key[1]:02d}:00' if group_by == 'hour_of_week' else key,
+            'booking_count': len(booking_ids.get(key, ())),
+            'booked_hours': round(booked_minutes.get(key, 0) / 60, 2),
+            'occupancy_percent': round(booked_minutes.get(key, 0) / capacity * 100, 2) if capacity else 0,
+            'peak_concurrency': _peak_concurrency(intervals.get(key, [])),
+            'avg_lead_time_hours': round(sum(leads) / len(leads), 2) if leads else None
+        })
+
+    result = {
+        'start': range_start.isoformat(),
+        'end': range_end.isoformat(),
+        'group_by': group_by,
+        'groups': groups
+    }
+    timeseries_cache.set(cache_key, result)
+    return result
@@ -0,0 +1,136 @@
+import json
+from sqlalchemy import select
+from models import db, Booking, Room, User
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+COLUMNS = ['booking_id', 'room_id', 'room_name', 'user_id', 'user_name', 'start_time', 'end_time', 'status', 'created_at']
+
+def build_export_query(start=None, end=None, after_id=None, created_since=None, max_id=None):
+    query = select(
+        Booking.id,
+        Booking.room_id,
+        Room.name,
+        Booking.user_id,
+        User.name,
+        Booking.start_time,
+        Booking.end_time,
+        Booking.status,
+        Booking.created_at
+    ).join(Room, Booking.room_id == Room.id).join(User, Booking.user_id == User.id)
+
+    if start is not None:
+        query = query.where(Booking.start_time >= start)
+    if end is not None:
+        query = query.where(Booking.start_time < end)
+    if after_id is not None:
+        query = query.where(Booking.id > after_id)
+    if created_since is not None:
+        query = query.where(Booking.created_at >= created_since)
+    if max_id is not None:
+        query = query.where(Booking.id <= max_id)
+
+    return query.order_by(Booking.id)
+
+def iter_batches(query, batch_size):
+    """Yield lists of row tuples, read through a server-side cursor where supported."""
+    result = db.session.execute(
+        query,
+        execution_options={'stream_results': True, 'yield_per': batch_size}
+    )
+    for partition in result.partitions(batch_size):
+        yield partition
+
+class _ChunkSink:
+    """Write-only file object that hands buffered bytes back to a streaming response."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def _arrow_schema():
+    return pa.schema([
+        ('booking_id', pa.int64()),
+        ('room_id', pa.int64()),
+        ('room_name', pa.string()),
+        ('user_id', pa.int64()),
+        ('user_name', pa.string()),
+        ('start_time', pa.timestamp('us')),
+        ('end_time', pa.timestamp('us')),
+        ('status', pa.string()),
+        ('created_at', pa.timestamp('us'))
+    ])
+
+def _record_batch(rows, schema):
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema
+    )
+
+def stream_ndjson(query, batch_size):
+    for rows in iter_batches(query, batch_size):
+        lines = []
+        for row in rows:
+            record = dict(zip(COLUMNS, row))
+            for field in ('start_time', 'end_time', 'created_at'):
+                if record[field] is not None:
+                    record[field] = record[field].isoformat()
+            lines.append(json.dumps(record))
+        yield '\n'.join(lines) + '\n'
+
+def stream_arrow(query, batch_size):
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for rows in iter_batches(query, batch_size):
+            writer.write_batch(_record_batch(rows, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+def stream_parquet(query, batch_size):
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression='snappy') as writer:
+        for rows in iter_batches(query, batch_size):
+            writer.write_batch(_record_batch(rows, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+STREAMERS = {
+    'ndjson': stream_ndjson,
+    'arrow': stream_arrow,
+    'parquet': stream_parquet
+}
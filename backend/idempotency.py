@@ -0,0 +1,190 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models import db, IdempotencyRecord
+from cache import TTLCache
+from routing import current_site
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+PENDING_STATUS = 0
+PENDING_TIMEOUT = timedelta(seconds=60)
+
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+def init_idempotency(app):
+    app.extensions['idempotency_cache'] = TTLCache(
+        maxsize=app.config.get('IDEMPOTENCY_MAX_KEYS', 10000),
+        ttl=app.config.get('IDEMPOTENCY_TTL_SECONDS', 86400)
+    )
+
+def _request_fingerprint():
+    return hashlib.sha256(request.get_data()).hexdigest()
+
+def _record_session():
+    return Session(bind=db.session.get_bind(IdempotencyRecord.__mapper__))
+
+def _key_filter(cache_key):
+    return (
+        IdempotencyRecord.key == cache_key[0],
+        IdempotencyRecord.method == cache_key[1],
+        IdempotencyRecord.path == cache_key[2]
+    )
+
+def _load_record(cache_key):
+    cache = current_app.extensions['idempotency_cache']
+    record = cache.get(cache_key)
+    if record is not None or not current_app.config.get('IDEMPOTENCY_PERSIST'):
+        return record
+
+    ttl = current_app.config.get('IDEMPOTENCY_TTL_SECONDS', 86400)
+    stored = IdempotencyRecord.query.filter(
+        *_key_filter(cache_key),
+        IdempotencyRecord.created_at > datetime.utcnow() - timedelta(seconds=ttl)
+    ).first()
+    if not stored:
+        return None
+
+    record = (stored.request_hash, stored.status_code, stored.response_body, stored.mimetype)
+    if stored.status_code != PENDING_STATUS:
+        cache.set(cache_key, record)
+    return record
+
+def _reserve_record(cache_key, fingerprint):
+    # A pending row claims the key across workers; the primary key rejects a second claim
+    if not current_app.config.get('IDEMPOTENCY_PERSIST'):
+        return True
+
+    now = datetime.utcnow()
+    ttl = current_app.config.get('IDEMPOTENCY_TTL_SECONDS', 86400)
+    with _record_session() as record_session:
+        record_session.query(IdempotencyRecord).filter(
+            *_key_filter(cache_key),
+            (IdempotencyRecord.created_at <= now - timedelta(seconds=ttl)) | (
+                (IdempotencyRecord.status_code == PENDING_STATUS) & (IdempotencyRecord.created_at <= now - PENDING_TIMEOUT)
+            )
+        ).delete(synchronize_session=False)
+        record_session.add(IdempotencyRecord(
+            key=cache_key[0],
+            method=cache_key[1],
+            path=cache_key[2],
+            request_hash=fingerprint,
+            status_code=PENDING_STATUS,
+            response_body=b'',
+            mimetype='',
+            created_at=now
+        ))
+        try:
+            record_session.commit()
+        except IntegrityError:
+            record_session.rollback()
+            return False
+    return True
+
+def _release_record(cache_key):
+    if not current_app.config.get('IDEMPOTENCY_PERSIST'):
+        return
+
+    with _record_session() as record_session:
+        record_session.query(IdempotencyRecord).filter(
+            *_key_filter(cache_key),
+            IdempotencyRecord.status_code == PENDING_STATUS
+        ).delete(synchronize_session=False)
+        record_session.commit()
+
+def _store_record(cache_key, record):
+    current_app.extensions['idempotency_cache'].set(cache_key, record)
+    if not current_app.config.get('IDEMPOTENCY_PERSIST'):
+        return
+
+    # Separate session so storing the record never commits state the view left behind
+    ttl = current_app.config.get('IDEMPOTENCY_TTL_SECONDS', 86400)
+    with _record_session() as record_session:
+        record_session.query(IdempotencyRecord).filter(
+            IdempotencyRecord.created_at <= datetime.utcnow() - timedelta(seconds=ttl)
+        ).delete(synchronize_session=False)
+
+        request_hash, status_code, response_body, mimetype = record
+        record_session.merge(IdempotencyRecord(
+            key=cache_key[0],
+            method=cache_key[1],
+            path=cache_key[2],
+            request_hash=request_hash,
+            status_code=status_code,
+            response_body=response_body,
+            mimetype=mimetype,
+            created_at=datetime.utcnow()
+        ))
+        record_session.commit()
+
+def _in_progress():
+    return jsonify({'success': False, 'error': f'A request with this {IDEMPOTENCY_HEADER} is already in progress'}), 409
+
+def _replay(record, fingerprint):
+    request_hash, status_code, response_body, mimetype = record
+    if request_hash != fingerprint:
+        return jsonify({'success': False, 'error': f'{IDEMPOTENCY_HEADER} was already used with a different request'}), 422
+    if status_code == PENDING_STATUS:
+        return _in_progress()
+
+    response = make_response(response_body, status_code)
+    response.mimetype = mimetype
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+def idempotent(view):
+    """Replay the stored response when a request repeats its Idempotency-Key."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view(*args, **kwargs)
+
+        if len(key) > 255:
+            return jsonify({'success': False, 'error': f'{IDEMPOTENCY_HEADER} must be at most 255 characters'}), 400
+
+        cache_key = (f'{current_site()}:{key}', request.method, request.path)
+        fingerprint = _request_fingerprint()
+
+        record = _load_record(cache_key)
+        if record is not None:
+            return _replay(record, fingerprint)
+
+        with _in_flight_lock:
+            if cache_key in _in_flight:
+                return _in_progress()
+            _in_flight.add(cache_key)
+
+        try:
+            # The original may have finished between the first lookup and taking the key
+            record = _load_record(cache_key)
+            if record is not None:
+                return _replay(record, fingerprint)
+
+            if not _reserve_record(cache_key, fingerprint):
+                return _in_progress()
+
+            try:
+                response = make_response(view(*args, **kwargs))
+            except Exception:
+                db.session.rollback()
+                _release_record(cache_key)
+                raise
+
+            if response.status_code >= 400:
+                db.session.rollback()
+            if response.status_code < 500:
+                _store_record(cache_key, (fingerprint, response.status_code, response.get_data(), response.mimetype))
+            else:
+                _release_record(cache_key)
+            return response
+        finally:
+            with _in_flight_lock:
+                _in_flight.discard(cache_key)
+
+    return wrapper
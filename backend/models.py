@@ -1,13 +1,46 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import with_loader_criteria
 from datetime import datetime
+from routing import RoutingSession, DEFAULT_SITE, current_site
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
-class Department(db.Model):
+ACTIVE_ONLY = db.text('deleted_at IS NULL')
+
+class SoftDeleteMixin:
+    deleted_at = db.Column(db.DateTime, nullable=True)
+
+    @classmethod
+    def active(cls):
+        return cls.query.filter(cls.deleted_at.is_(None))
+
+    def soft_delete(self):
+        self.deleted_at = datetime.utcnow()
+
+class TenantMixin:
+    site = db.Column(db.String(50), nullable=False, default=lambda: current_site() or DEFAULT_SITE, index=True)
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _scope_to_site(execute_state):
+    site = current_site()
+    if site is None or not execute_state.is_select:
+        return
+    if execute_state.is_column_load or execute_state.is_relationship_load:
+        return
+
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(TenantMixin, lambda cls: cls.site == site, include_aliases=True)
+    )
+
+class Department(TenantMixin, SoftDeleteMixin, db.Model):
     __tablename__ = 'departments'
+    __table_args__ = (
+        db.Index('uq_departments_site_name_active', 'site', 'name', unique=True, postgresql_where=ACTIVE_ONLY, sqlite_where=ACTIVE_ONLY),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False, unique=True)
+    name = db.Column(db.String(100), nullable=False)
 
     users = db.relationship('User', backref='department', lazy=True)
     rooms = db.relationship('Room', backref='department', lazy=True)
@@ -15,15 +48,19 @@ class Department(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
+            'site': self.site,
             'name': self.name
         }
 
-class User(db.Model):
+class User(TenantMixin, SoftDeleteMixin, db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('uq_users_site_email_active', 'site', 'email', unique=True, postgresql_where=ACTIVE_ONLY, sqlite_where=ACTIVE_ONLY),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(120), nullable=False, unique=True)
+    email = db.Column(db.String(120), nullable=False)
     role = db.Column(db.String(20), nullable=False, default='user')
     department_id = db.Column(db.Integer, db.ForeignKey('departments.id'), nullable=True)
 
@@ -32,6 +69,7 @@ class User(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
+            'site': self.site,
             'name': self.name,
             'email': self.email,
             'role': self.role,
@@ -39,11 +77,14 @@ class User(db.Model):
             'department_name': self.department.name if self.department else None
         }
 
-class Room(db.Model):
+class Room(TenantMixin, SoftDeleteMixin, db.Model):
     __tablename__ = 'rooms'
+    __table_args__ = (
+        db.Index('uq_rooms_site_name_active', 'site', 'name', unique=True, postgresql_where=ACTIVE_ONLY, sqlite_where=ACTIVE_ONLY),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False, unique=True)
+    name = db.Column(db.String(100), nullable=False)
     capacity = db.Column(db.Integer, nullable=False)
     department_access = db.Column(db.Integer, db.ForeignKey('departments.id'), nullable=True)
     description = db.Column(db.Text)
@@ -53,6 +94,7 @@ class Room(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
+            'site': self.site,
             'name': self.name,
             'capacity': self.capacity,
             'department_access': self.department_access,
@@ -60,8 +102,13 @@ class Room(db.Model):
             'description': self.description
         }
 
-class Booking(db.Model):
+class Booking(TenantMixin, db.Model):
     __tablename__ = 'bookings'
+    __table_args__ = (
+        db.Index('ix_bookings_room_start', 'room_id', 'start_time'),
+        db.Index('ix_bookings_site_start', 'site', 'start_time'),
+        db.Index('ix_bookings_user_id', 'user_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
@@ -74,6 +121,51 @@ class Booking(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
+            'site': self.site,
+            'room_id': self.room_id,
+            'room_name': self.room.name if self.room else None,
+            'user_id': self.user_id,
+            'user_name': self.user.name if self.user else None,
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat(),
+            'status': self.status,
+            'created_at': self.created_at.isoformat()
+        }
+
+class IdempotencyRecord(db.Model):
+    __tablename__ = 'idempotency_records'
+
+    key = db.Column(db.String(310), primary_key=True)
+    method = db.Column(db.String(10), primary_key=True)
+    path = db.Column(db.String(255), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=False)
+    response_body = db.Column(db.LargeBinary, nullable=False)
+    mimetype = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+class WaitlistEntry(TenantMixin, db.Model):
+    __tablename__ = 'waitlist_entries'
+    __table_args__ = (
+        db.Index('ix_waitlist_room_start', 'room_id', 'start_time'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='waiting')
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    room = db.relationship('Room')
+    user = db.relationship('User')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'site': self.site,
             'room_id': self.room_id,
             'room_name': self.room.name if self.room else None,
             'user_id': self.user_id,
@@ -81,5 +173,6 @@ class Booking(db.Model):
             'start_time': self.start_time.isoformat(),
             'end_time': self.end_time.isoformat(),
             'status': self.status,
+            'booking_id': self.booking_id,
             'created_at': self.created_at.isoformat()
         }
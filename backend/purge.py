@@ -0,0 +1,88 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import click
+from flask import g
+from sqlalchemy import delete, or_, select, update
+from models import db, Booking, Room, User, Department, WaitlistEntry
+
+def _delete_in_chunks(model, condition, chunk_size):
+    deleted = 0
+    while True:
+        ids = db.session.execute(
+            select(model.id).where(condition).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            return deleted
+
+        db.session.execute(delete(model).where(model.id.in_(ids)))
+        db.session.commit()
+        deleted += len(ids)
+
+def purge_soft_deleted(retention_days=30, chunk_size=1000):
+    """Hard-delete rows soft-deleted more than retention_days ago, in chunks."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    purged_rooms = select(Room.id).where(Room.deleted_at <= cutoff)
+    purged_users = select(User.id).where(User.deleted_at <= cutoff)
+    purged_departments = select(Department.id).where(Department.deleted_at <= cutoff)
+
+    counts = {
+        'waitlist_entries': _delete_in_chunks(
+            WaitlistEntry,
+            or_(WaitlistEntry.room_id.in_(purged_rooms), WaitlistEntry.user_id.in_(purged_users)),
+            chunk_size
+        ),
+        'bookings': _delete_in_chunks(
+            Booking,
+            or_(Booking.room_id.in_(purged_rooms), Booking.user_id.in_(purged_users)),
+            chunk_size
+        ),
+        'rooms': _delete_in_chunks(Room, Room.deleted_at <= cutoff, chunk_size),
+        'users': _delete_in_chunks(User, User.deleted_at <= cutoff, chunk_size)
+    }
+
+    db.session.execute(
+        update(User).where(User.department_id.in_(purged_departments)).values(department_id=None)
+    )
+    db.session.execute(
+        update(Room).where(Room.department_access.in_(purged_departments)).values(department_access=None)
+    )
+    db.session.commit()
+    counts['departments'] = _delete_in_chunks(Department, Department.deleted_at <= cutoff, chunk_size)
+
+    return counts
+
+def purge_all_sites(app, retention_days, chunk_size):
+    counts = {}
+    for site in app.config['SITES']:
+        with app.app_context():
+            g.site = site
+            counts[site] = purge_soft_deleted(retention_days, chunk_size)
+    return counts
+
+def _purge_loop(app, interval_seconds):
+    while True:
+        time.sleep(interval_seconds)
+        try:
+            purge_all_sites(app, app.config['PURGE_RETENTION_DAYS'], app.config['PURGE_CHUNK_SIZE'])
+        except Exception as e:
+            app.logger.error(f'Soft-delete purge failed: {str(e)}')
+
+def init_purge(app):
+    @app.cli.command('purge-deleted')
+    @click.option('--retention-days', type=int, default=None, help='Only purge rows deleted this many days ago.')
+    @click.option('--chunk-size', type=int, default=None, help='Rows deleted per transaction.')
+    def purge_deleted_command(retention_days, chunk_size):
+        counts = purge_all_sites(
+            app,
+            app.config['PURGE_RETENTION_DAYS'] if retention_days is None else retention_days,
+            chunk_size or app.config['PURGE_CHUNK_SIZE']
+        )
+        for site, site_counts in counts.items():
+            for table, count in site_counts.items():
+                print(f'[{site}] Purged {count} {table}')
+
+def start_purge_worker(app):
+    interval_seconds = app.config.get('PURGE_INTERVAL_SECONDS', 0)
+    if interval_seconds > 0:
+        threading.Thread(target=_purge_loop, args=(app, interval_seconds), daemon=True).start()
@@ -1,14 +1,24 @@
 from flask import Blueprint, request, jsonify
-from models import db, Booking, Room, User
+from models import db, Booking, Room, User, WaitlistEntry
+from routing import use_replica
+from idempotency import idempotent
 from datetime import datetime, timedelta
 from sqlalchemy import and_, or_
 
 bookings_bp = Blueprint('bookings', __name__)
 
+BOOKING_BUFFER = timedelta(minutes=5)
+
+def parse_booking_time(value):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo:
+        # Booking times are naive local wall-clock time, like datetime.now()
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
 def validate_booking_conflict(room_id, start_time, end_time, booking_id=None):
-    buffer_minutes = 5
-    start_with_buffer = start_time - timedelta(minutes=buffer_minutes)
-    end_with_buffer = end_time + timedelta(minutes=buffer_minutes)
+    start_with_buffer = start_time - BOOKING_BUFFER
+    end_with_buffer = end_time + BOOKING_BUFFER
 
     query = Booking.query.filter(
         Booking.room_id == room_id,
@@ -38,16 +48,15 @@ def find_next_available_slot(room_id, date, requested_start, duration_minutes=60
     ).order_by(Booking.start_time).all()
 
     current_time = max(requested_start, day_start)
-    buffer_minutes = 5
 
     for booking in bookings:
         potential_end = current_time + timedelta(minutes=duration_minutes)
-        if potential_end + timedelta(minutes=buffer_minutes) <= booking.start_time:
+        if potential_end + BOOKING_BUFFER <= booking.start_time:
             return {
                 'start_time': current_time.strftime('%H:%M'),
                 'end_time': potential_end.strftime('%H:%M')
             }
-        current_time = booking.end_time + timedelta(minutes=buffer_minutes)
+        current_time = booking.end_time + BOOKING_BUFFER
 
     potential_end = current_time + timedelta(minutes=duration_minutes)
     if potential_end <= day_end:
@@ -58,7 +67,88 @@ def find_next_available_slot(room_id, date, requested_start, duration_minutes=60
 
     return None
 
+def _overlaps(start_a, end_a, start_b, end_b):
+    return start_a < end_b + BOOKING_BUFFER and end_a > start_b - BOOKING_BUFFER
+
+def add_to_waitlist(room, user, start_time, end_time):
+    entry = WaitlistEntry(
+        room_id=room.id,
+        user_id=user.id,
+        start_time=start_time,
+        end_time=end_time,
+        status='waiting'
+    )
+    db.session.add(entry)
+    return entry
+
+def find_waiting_entry(room_id, user_id, start_time, end_time):
+    return WaitlistEntry.query.filter_by(
+        room_id=room_id,
+        user_id=user_id,
+        start_time=start_time,
+        end_time=end_time,
+        status='waiting'
+    ).first()
+
+def promote_waitlist(room_id, freed_start, freed_end):
+    """Book waiters whose slot now fits in the interval freed in room_id."""
+    room = Room.active().filter_by(id=room_id).first()
+    if not room:
+        return []
+
+    candidates = WaitlistEntry.query.filter(
+        WaitlistEntry.room_id == room_id,
+        WaitlistEntry.status == 'waiting',
+        WaitlistEntry.start_time < freed_end + BOOKING_BUFFER,
+        WaitlistEntry.end_time > freed_start - BOOKING_BUFFER,
+        WaitlistEntry.start_time > datetime.now()
+    ).order_by(WaitlistEntry.created_at, WaitlistEntry.id).with_for_update(skip_locked=True).all()
+
+    if not candidates:
+        return []
+
+    window_start = min(entry.start_time for entry in candidates) - BOOKING_BUFFER
+    window_end = max(entry.end_time for entry in candidates) + BOOKING_BUFFER
+    busy = [
+        (start_time, end_time)
+        for start_time, end_time in db.session.query(Booking.start_time, Booking.end_time).filter(
+            Booking.room_id == room_id,
+            Booking.status != 'rejected',
+            Booking.start_time < window_end,
+            Booking.end_time > window_start
+        ).all()
+    ]
+
+    promoted = []
+    for entry in candidates:
+        if any(_overlaps(entry.start_time, entry.end_time, start, end) for start, end in busy):
+            continue
+
+        user = entry.user
+        if user.deleted_at is not None:
+            continue
+        if room.department_access and user.department_id != room.department_access:
+            continue
+
+        booking = Booking(
+            room_id=room_id,
+            user_id=user.id,
+            start_time=entry.start_time,
+            end_time=entry.end_time,
+            status='approved' if user.role == 'admin' else 'pending'
+        )
+        db.session.add(booking)
+        db.session.flush()
+
+        entry.status = 'promoted'
+        entry.booking_id = booking.id
+        busy.append((entry.start_time, entry.end_time))
+        promoted.append(booking)
+
+    return promoted
+
 @bookings_bp.route('/api/bookings', methods=['GET'])
+@use_replica
 def get_bookings():
     date_str = request.args.get('date')
 
@@ -83,6 +173,7 @@ def get_bookings():
     })
 
 @bookings_bp.route('/api/bookings', methods=['POST'])
+@idempotent
 def create_booking():
     data = request.get_json()
 
@@ -92,19 +183,19 @@ def create_booking():
             return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
 
     try:
-        start_time = datetime.fromisoformat(data['start_time'].replace('Z', '+00:00'))
-        end_time = datetime.fromisoformat(data['end_time'].replace('Z', '+00:00'))
+        start_time = parse_booking_time(data['start_time'])
+        end_time = parse_booking_time(data['end_time'])
     except (ValueError, AttributeError):
         return jsonify({'success': False, 'error': 'Invalid datetime format. Use ISO 8601 format'}), 400
 
     if end_time <= start_time:
         return jsonify({'success': False, 'error': 'End time must be after start time'}), 400
 
-    room = Room.query.get(data['room_id'])
+    room = Room.active().filter_by(id=data['room_id']).first()
     if not room:
         return jsonify({'success': False, 'error': 'Room not found'}), 404
 
-    user = User.query.get(data['user_id'])
+    user = User.active().filter_by(id=data['user_id']).first()
     if not user:
         return jsonify({'success': False, 'error': 'User not found'}), 404
 
@@ -119,11 +210,20 @@ def create_booking():
         duration = int((end_time - start_time).total_seconds() / 60)
         next_slot = find_next_available_slot(room.id, start_time.date(), start_time, duration)
 
-        return jsonify({
+        response = {
             'success': False,
             'error': f'Room already booked between {conflicting_booking.start_time.strftime("%H:%M")}–{conflicting_booking.end_time.strftime("%H:%M")}',
             'next_available': next_slot
-        }), 409
+        }
+
+        if data.get('join_waitlist') and start_time > datetime.now():
+            entry = find_waiting_entry(room.id, user.id, start_time, end_time)
+            if not entry:
+                entry = add_to_waitlist(room, user, start_time, end_time)
+                db.session.commit()
+            response['waitlist_entry'] = entry.to_dict()
+
+        return jsonify(response), 409
 
     status = 'approved' if user.role == 'admin' else 'pending'
 
@@ -146,12 +246,14 @@ def create_booking():
     }), 201
 
 @bookings_bp.route('/api/bookings/<int:booking_id>', methods=['PUT'])
+@idempotent
 def update_booking(booking_id):
     booking = Booking.query.get(booking_id)
     if not booking:
         return jsonify({'success': False, 'error': 'Booking not found'}), 404
 
     data = request.get_json()
+    previous_status, previous_start, previous_end = booking.status, booking.start_time, booking.end_time
 
     if 'status' in data:
         if data['status'] not in ['pending', 'approved', 'rejected']:
@@ -160,8 +262,8 @@ def update_booking(booking_id):
 
     if 'start_time' in data or 'end_time' in data:
         try:
-            start_time = datetime.fromisoformat(data['start_time'].replace('Z', '+00:00')) if 'start_time' in data else booking.start_time
-            end_time = datetime.fromisoformat(data['end_time'].replace('Z', '+00:00')) if 'end_time' in data else booking.end_time
+            start_time = parse_booking_time(data['start_time']) if 'start_time' in data else booking.start_time
+            end_time = parse_booking_time(data['end_time']) if 'end_time' in data else booking.end_time
         except (ValueError, AttributeError):
             return jsonify({'success': False, 'error': 'Invalid datetime format'}), 400
 
@@ -178,23 +280,35 @@ def update_booking(booking_id):
         booking.start_time = start_time
         booking.end_time = end_time
 
+    promoted = []
+    if previous_status != 'rejected' and (
+        booking.status == 'rejected' or (booking.start_time, booking.end_time) != (previous_start, previous_end)
+    ):
+        promoted = promote_waitlist(booking.room_id, previous_start, previous_end)
+
     db.session.commit()
 
     return jsonify({
         'success': True,
-        'booking': booking.to_dict()
+        'booking': booking.to_dict(),
+        'waitlist_promoted': [promoted_booking.id for promoted_booking in promoted]
     })
 
 @bookings_bp.route('/api/bookings/<int:booking_id>', methods=['DELETE'])
+@idempotent
 def delete_booking(booking_id):
     booking = Booking.query.get(booking_id)
     if not booking:
         return jsonify({'success': False, 'error': 'Booking not found'}), 404
 
+    room_id, start_time, end_time = booking.room_id, booking.start_time, booking.end_time
     db.session.delete(booking)
+
+    promoted = promote_waitlist(room_id, start_time, end_time)
     db.session.commit()
 
     return jsonify({
         'success': True,
-        'message': 'Booking deleted successfully'
+        'message': 'Booking deleted successfully',
+        'waitlist_promoted': [promoted_booking.id for promoted_booking in promoted]
     })
@@ -1,19 +1,23 @@
 from flask import Blueprint, request, jsonify
-from models import db, Department
+from models import db, Department, User, Room
+from routing import use_replica
+from idempotency import idempotent
 
 departments_bp = Blueprint('departments', __name__)
 
 @departments_bp.route('/api/departments', methods=['GET'])
+@use_replica
 def get_departments():
-    departments = Department.query.all()
+    departments = Department.active().all()
     return jsonify({
         'success': True,
         'departments': [dept.to_dict() for dept in departments]
     })
 
 @departments_bp.route('/api/departments/<int:dept_id>', methods=['GET'])
+@use_replica
 def get_department(dept_id):
-    department = Department.query.get(dept_id)
+    department = Department.active().filter_by(id=dept_id).first()
     if not department:
         return jsonify({'success': False, 'error': 'Department not found'}), 404
 
@@ -23,13 +27,14 @@ def get_department(dept_id):
     })
 
 @departments_bp.route('/api/departments', methods=['POST'])
+@idempotent
 def create_department():
     data = request.get_json()
 
     if 'name' not in data:
         return jsonify({'success': False, 'error': 'Department name is required'}), 400
 
-    if Department.query.filter_by(name=data['name']).first():
+    if Department.active().filter_by(name=data['name']).first():
         return jsonify({'success': False, 'error': 'Department with this name already exists'}), 409
 
     department = Department(name=data['name'])
@@ -43,15 +48,16 @@ def create_department():
     }), 201
 
 @departments_bp.route('/api/departments/<int:dept_id>', methods=['PUT'])
+@idempotent
 def update_department(dept_id):
-    department = Department.query.get(dept_id)
+    department = Department.active().filter_by(id=dept_id).first()
     if not department:
         return jsonify({'success': False, 'error': 'Department not found'}), 404
 
     data = request.get_json()
 
     if 'name' in data:
-        existing_dept = Department.query.filter_by(name=data['name']).first()
+        existing_dept = Department.active().filter_by(name=data['name']).first()
         if existing_dept and existing_dept.id != dept_id:
             return jsonify({'success': False, 'error': 'Department with this name already exists'}), 409
         department.name = data['name']
@@ -64,12 +70,15 @@ def update_department(dept_id):
     })
 
 @departments_bp.route('/api/departments/<int:dept_id>', methods=['DELETE'])
+@idempotent
 def delete_department(dept_id):
-    department = Department.query.get(dept_id)
+    department = Department.active().filter_by(id=dept_id).first()
     if not department:
         return jsonify({'success': False, 'error': 'Department not found'}), 404
 
-    db.session.delete(department)
+    User.query.filter_by(department_id=dept_id).update({'department_id': None}, synchronize_session=False)
+    Room.query.filter_by(department_access=dept_id).update({'department_access': None}, synchronize_session=False)
+    department.soft_delete()
     db.session.commit()
 
     return jsonify({
@@ -1,19 +1,24 @@
 from flask import Blueprint, request, jsonify
-from models import db, Room, Department
+from models import db, Room, Department, Booking, WaitlistEntry
+from routing import use_replica
+from idempotency import idempotent
+from datetime import datetime
 
 rooms_bp = Blueprint('rooms', __name__)
 
 @rooms_bp.route('/api/rooms', methods=['GET'])
+@use_replica
 def get_rooms():
-    rooms = Room.query.all()
+    rooms = Room.active().all()
     return jsonify({
         'success': True,
         'rooms': [room.to_dict() for room in rooms]
     })
 
 @rooms_bp.route('/api/rooms/<int:room_id>', methods=['GET'])
+@use_replica
 def get_room(room_id):
-    room = Room.query.get(room_id)
+    room = Room.active().filter_by(id=room_id).first()
     if not room:
         return jsonify({'success': False, 'error': 'Room not found'}), 404
 
@@ -23,6 +28,7 @@ def get_room(room_id):
     })
 
 @rooms_bp.route('/api/rooms', methods=['POST'])
+@idempotent
 def create_room():
     data = request.get_json()
 
@@ -31,11 +37,11 @@ def create_room():
         if field not in data:
             return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
 
-    if Room.query.filter_by(name=data['name']).first():
+    if Room.active().filter_by(name=data['name']).first():
         return jsonify({'success': False, 'error': 'Room with this name already exists'}), 409
 
     if data.get('department_access'):
-        department = Department.query.get(data['department_access'])
+        department = Department.active().filter_by(id=data['department_access']).first()
         if not department:
             return jsonify({'success': False, 'error': 'Department not found'}), 404
 
@@ -55,15 +61,16 @@ def create_room():
     }), 201
 
 @rooms_bp.route('/api/rooms/<int:room_id>', methods=['PUT'])
+@idempotent
 def update_room(room_id):
-    room = Room.query.get(room_id)
+    room = Room.active().filter_by(id=room_id).first()
     if not room:
         return jsonify({'success': False, 'error': 'Room not found'}), 404
 
     data = request.get_json()
 
     if 'name' in data:
-        existing_room = Room.query.filter_by(name=data['name']).first()
+        existing_room = Room.active().filter_by(name=data['name']).first()
         if existing_room and existing_room.id != room_id:
             return jsonify({'success': False, 'error': 'Room with this name already exists'}), 409
         room.name = data['name']
@@ -73,7 +80,7 @@ def update_room(room_id):
 
     if 'department_access' in data:
         if data['department_access']:
-            department = Department.query.get(data['department_access'])
+            department = Department.active().filter_by(id=data['department_access']).first()
             if not department:
                 return jsonify({'success': False, 'error': 'Department not found'}), 404
         room.department_access = data['department_access']
@@ -89,12 +96,19 @@ def update_room(room_id):
     })
 
 @rooms_bp.route('/api/rooms/<int:room_id>', methods=['DELETE'])
+@idempotent
 def delete_room(room_id):
-    room = Room.query.get(room_id)
+    room = Room.active().filter_by(id=room_id).first()
     if not room:
         return jsonify({'success': False, 'error': 'Room not found'}), 404
 
-    db.session.delete(room)
+    Booking.query.filter(
+        Booking.room_id == room_id,
+        Booking.status != 'rejected',
+        Booking.start_time > datetime.now()
+    ).update({'status': 'rejected'}, synchronize_session=False)
+    WaitlistEntry.query.filter_by(room_id=room_id, status='waiting').update({'status': 'cancelled'}, synchronize_session=False)
+    room.soft_delete()
     db.session.commit()
 
     return jsonify({
@@ -1,5 +1,9 @@
 from flask import Blueprint, request, jsonify
-from models import db, User, Department
+from models import db, User, Department, Booking, WaitlistEntry
+from routing import use_replica
+from idempotency import idempotent
+from routes.bookings import promote_waitlist
+from datetime import datetime
 
 users_bp = Blueprint('users', __name__)
 
@@ -10,7 +14,7 @@ def login():
     if 'email' not in data:
         return jsonify({'success': False, 'error': 'Email is required'}), 400
 
-    user = User.query.filter_by(email=data['email']).first()
+    user = User.active().filter_by(email=data['email']).first()
 
     if not user:
         return jsonify({'success': False, 'error': 'User not found'}), 404
@@ -22,16 +26,18 @@ def login():
     })
 
 @users_bp.route('/api/users', methods=['GET'])
+@use_replica
 def get_users():
-    users = User.query.all()
+    users = User.active().all()
     return jsonify({
         'success': True,
         'users': [user.to_dict() for user in users]
     })
 
 @users_bp.route('/api/users/<int:user_id>', methods=['GET'])
+@use_replica
 def get_user(user_id):
-    user = User.query.get(user_id)
+    user = User.active().filter_by(id=user_id).first()
     if not user:
         return jsonify({'success': False, 'error': 'User not found'}), 404
 
@@ -41,6 +47,7 @@ def get_user(user_id):
     })
 
 @users_bp.route('/api/users', methods=['POST'])
+@idempotent
 def create_user():
     data = request.get_json()
 
@@ -49,7 +56,7 @@ def create_user():
         if field not in data:
             return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
 
-    if User.query.filter_by(email=data['email']).first():
+    if User.active().filter_by(email=data['email']).first():
         return jsonify({'success': False, 'error': 'User with this email already exists'}), 409
 
     role = data.get('role', 'user')
@@ -57,7 +64,7 @@ def create_user():
         return jsonify({'success': False, 'error': 'Invalid role. Must be user, admin, or approver'}), 400
 
     if data.get('department_id'):
-        department = Department.query.get(data['department_id'])
+        department = Department.active().filter_by(id=data['department_id']).first()
         if not department:
             return jsonify({'success': False, 'error': 'Department not found'}), 404
 
@@ -77,8 +84,9 @@ def create_user():
     }), 201
 
 @users_bp.route('/api/users/<int:user_id>', methods=['PUT'])
+@idempotent
 def update_user(user_id):
-    user = User.query.get(user_id)
+    user = User.active().filter_by(id=user_id).first()
     if not user:
         return jsonify({'success': False, 'error': 'User not found'}), 404
 
@@ -88,7 +96,7 @@ def update_user(user_id):
         user.name = data['name']
 
     if 'email' in data:
-        existing_user = User.query.filter_by(email=data['email']).first()
+        existing_user = User.active().filter_by(email=data['email']).first()
         if existing_user and existing_user.id != user_id:
             return jsonify({'success': False, 'error': 'User with this email already exists'}), 409
         user.email = data['email']
@@ -100,7 +108,7 @@ def update_user(user_id):
 
     if 'department_id' in data:
         if data['department_id']:
-            department = Department.query.get(data['department_id'])
+            department = Department.active().filter_by(id=data['department_id']).first()
             if not department:
                 return jsonify({'success': False, 'error': 'Department not found'}), 404
         user.department_id = data['department_id']
@@ -113,12 +121,24 @@ def update_user(user_id):
     })
 
 @users_bp.route('/api/users/<int:user_id>', methods=['DELETE'])
+@idempotent
 def delete_user(user_id):
-    user = User.query.get(user_id)
+    user = User.active().filter_by(id=user_id).first()
     if not user:
         return jsonify({'success': False, 'error': 'User not found'}), 404
 
-    db.session.delete(user)
+    upcoming = Booking.query.filter(
+        Booking.user_id == user_id,
+        Booking.status != 'rejected',
+        Booking.start_time > datetime.now()
+    )
+    freed_slots = upcoming.with_entities(Booking.room_id, Booking.start_time, Booking.end_time).all()
+    upcoming.update({'status': 'rejected'}, synchronize_session=False)
+    WaitlistEntry.query.filter_by(user_id=user_id, status='waiting').update({'status': 'cancelled'}, synchronize_session=False)
+    user.soft_delete()
+
+    for room_id, start_time, end_time in freed_slots:
+        promote_waitlist(room_id, start_time, end_time)
     db.session.commit()
 
     return jsonify({
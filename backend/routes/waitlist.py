@@ -0,0 +1,90 @@
+from flask import Blueprint, request, jsonify
+from models import db, Room, User, WaitlistEntry
+from routing import use_replica
+from idempotency import idempotent
+from routes.bookings import add_to_waitlist, find_waiting_entry, parse_booking_time, validate_booking_conflict
+from datetime import datetime
+
+waitlist_bp = Blueprint('waitlist', __name__)
+
+@waitlist_bp.route('/api/waitlist', methods=['GET'])
+@use_replica
+def get_waitlist():
+    query = WaitlistEntry.query.filter_by(status=request.args.get('status', 'waiting'))
+
+    if request.args.get('room_id'):
+        query = query.filter_by(room_id=request.args.get('room_id', type=int))
+    if request.args.get('user_id'):
+        query = query.filter_by(user_id=request.args.get('user_id', type=int))
+
+    entries = query.order_by(WaitlistEntry.start_time, WaitlistEntry.created_at).limit(500).all()
+
+    return jsonify({
+        'success': True,
+        'waitlist': [entry.to_dict() for entry in entries]
+    })
+
+@waitlist_bp.route('/api/waitlist', methods=['POST'])
+@idempotent
+def join_waitlist():
+    data = request.get_json()
+
+    required_fields = ['room_id', 'user_id', 'start_time', 'end_time']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
+
+    try:
+        start_time = parse_booking_time(data['start_time'])
+        end_time = parse_booking_time(data['end_time'])
+    except (ValueError, AttributeError):
+        return jsonify({'success': False, 'error': 'Invalid datetime format. Use ISO 8601 format'}), 400
+
+    if end_time <= start_time:
+        return jsonify({'success': False, 'error': 'End time must be after start time'}), 400
+
+    room = Room.active().filter_by(id=data['room_id']).first()
+    if not room:
+        return jsonify({'success': False, 'error': 'Room not found'}), 404
+
+    user = User.active().filter_by(id=data['user_id']).first()
+    if not user:
+        return jsonify({'success': False, 'error': 'User not found'}), 404
+
+    if room.department_access and user.department_id != room.department_access:
+        return jsonify({
+            'success': False,
+            'error': f'Access denied. This room is restricted to {room.department.name} department'
+        }), 403
+
+    if start_time <= datetime.now():
+        return jsonify({'success': False, 'error': 'Cannot join the waitlist for a time that has already started'}), 400
+
+    if not validate_booking_conflict(room.id, start_time, end_time):
+        return jsonify({'success': False, 'error': 'Room is available for this time. Book it directly'}), 400
+
+    if find_waiting_entry(room.id, user.id, start_time, end_time):
+        return jsonify({'success': False, 'error': 'Already on the waitlist for this time'}), 409
+
+    entry = add_to_waitlist(room, user, start_time, end_time)
+    db.session.commit()
+
+    return jsonify({
+        'success': True,
+        'waitlist_entry': entry.to_dict()
+    }), 201
+
+@waitlist_bp.route('/api/waitlist/<int:entry_id>', methods=['DELETE'])
+@idempotent
+def leave_waitlist(entry_id):
+    entry = WaitlistEntry.query.filter_by(id=entry_id, status='waiting').first()
+    if not entry:
+        return jsonify({'success': False, 'error': 'Waitlist entry not found'}), 404
+
+    entry.status = 'cancelled'
+    db.session.commit()
+
+    return jsonify({
+        'success': True,
+        'message': 'Left waitlist successfully'
+    })
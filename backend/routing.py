@@ -0,0 +1,121 @@
+import random
+import time
+from functools import wraps
+from flask import current_app, g, has_app_context, has_request_context, jsonify, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.schema import CreateSchema
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+
+PRIMARY_COOKIE = 'smartmeet_primary_until'
+SITE_HEADER = 'X-Site'
+DEFAULT_SITE = 'default'
+
+_schema_engines = {}
+
+class RoutingSession(Session):
+    """Routes each statement to the site database, a read replica or the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None:
+            return bind
+
+        site = current_site()
+        engine = None
+
+        if self._flushing or isinstance(clause, UpdateBase):
+            _mark_primary_write()
+        elif _replica_allowed() and (clause is None or isinstance(clause, Select)):
+            replica_key = _request_replica_key()
+            if replica_key:
+                engine = self._db.engines[replica_key]
+
+        site_key = f'site_{site}'
+        if site_key in current_app.config.get('SITE_BIND_KEYS', []):
+            engine = self._db.engines[site_key]
+        elif engine is None:
+            engine = super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+        schema = current_app.config.get('SITE_SCHEMAS', {}).get(site)
+        return _schema_engine(engine, schema) if schema else engine
+
+def _schema_engine(engine, schema):
+    key = (engine, schema)
+    if key not in _schema_engines:
+        _schema_engines[key] = engine.execution_options(schema_translate_map={None: schema})
+    return _schema_engines[key]
+
+def current_site():
+    if has_app_context():
+        return g.get('site')
+    return None
+
+def parse_site_mapping(value):
+    mapping = {}
+    for item in value.split(','):
+        if '=' in item:
+            site, target = item.split('=', 1)
+            mapping[site.strip()] = target.strip()
+    return mapping
+
+def _request_replica_key():
+    # One replica per request, so every read sees the same replication position
+    if 'db_replica_key' not in g:
+        replica_keys = current_app.config.get('REPLICA_BIND_KEYS', [])
+        g.db_replica_key = random.choice(replica_keys) if replica_keys else None
+    return g.db_replica_key
+
+def _mark_primary_write():
+    if has_request_context():
+        g.db_wrote_primary = True
+
+def _replica_allowed():
+    if not has_request_context():
+        return False
+    if not g.get('db_use_replica') or g.get('db_wrote_primary'):
+        return False
+
+    try:
+        primary_until = float(request.cookies.get(PRIMARY_COOKIE, 0))
+    except ValueError:
+        primary_until = 0
+    return primary_until < time.time()
+
+def use_replica(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_use_replica = True
+        return view(*args, **kwargs)
+    return wrapper
+
+def init_replica_routing(app):
+    @app.after_request
+    def set_primary_stickiness(response):
+        if g.get('db_wrote_primary'):
+            sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', 5)
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                str(time.time() + sticky_seconds),
+                max_age=sticky_seconds,
+                httponly=True
+            )
+        return response
+
+def init_site_routing(app):
+    @app.before_request
+    def resolve_site():
+        site = request.headers.get(SITE_HEADER) or request.args.get('site') or DEFAULT_SITE
+        if site not in app.config.get('SITES', [DEFAULT_SITE]):
+            return jsonify({'success': False, 'error': f'Unknown site: {site}'}), 404
+        g.site = site
+
+def create_site_tables(db):
+    for key in current_app.config.get('SITE_BIND_KEYS', []):
+        db.metadata.create_all(bind=db.engines[key])
+
+    for site, schema in current_app.config.get('SITE_SCHEMAS', {}).items():
+        site_key = f'site_{site}'
+        engine = db.engines[site_key] if site_key in current_app.config.get('SITE_BIND_KEYS', []) else db.engine
+        with engine.begin() as connection:
+            connection.execute(CreateSchema(schema, if_not_exists=True))
+            db.metadata.create_all(bind=connection.execution_options(schema_translate_map={None: schema}))